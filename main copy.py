@@ -14,50 +14,59 @@ app.add_middleware(
 )
 
 from fastapi import UploadFile, File, HTTPException
-import base64
-from google.generativeai import GenerativeModel, configure
+import asyncio
+from google.generativeai import GenerativeModel, configure, upload_file
 from google.generativeai.types import GenerationConfig
 import os
 import json
 from fastapi.responses import JSONResponse
 
+# Configure the client and build the model once rather than per request
+configure(api_key=os.getenv("GEMINI_API_KEY"))
+MODEL = GenerativeModel('gemini-2.5-flash')
+
+# Uploads up to this size are sent inline, larger ones go through the File API
+INLINE_UPLOAD_LIMIT = 2 * 1024 * 1024
+
 @app.post("/api/analyze-document")
 async def analyze_document(file: UploadFile = File(...)):
     """Process documents with Google GenAI"""
     try:
-        contents = await file.read()
-        configure(api_key=os.getenv("GEMINI_API_KEY"))
-        model = GenerativeModel('gemini-2.5-Flash')
-        
-        # Handle different file types
-        if file.content_type.startswith('image/'):
+        uploaded = None
+        if file.size is not None and file.size <= INLINE_UPLOAD_LIMIT:
+            # The SDK accepts raw bytes for any file type and encodes them itself
             file_part = {
                 "mime_type": file.content_type,
-                "data": base64.b64encode(contents).decode('utf-8')
+                "data": await file.read()
             }
         else:
-            file_part = {
-                "mime_type": file.content_type,
-                "data": contents.decode('utf-8')
-            }
+            # UploadFile is already spooled to disk, hand its file object to the File API
+            await file.seek(0)
+            uploaded = await asyncio.to_thread(upload_file, file.file, mime_type=file.content_type)
+            file_part = uploaded
         text_part = {
             "text": "Analyze the attached project document. Extract project name, description, and skills."
         }
 
-        response = await model.generate_content(
-            contents=[text_part["text"], file_part],
-            generation_config=GenerationConfig(
-                response_mime_type="application/json",
-                response_schema={
-                    "type": "object",
-                    "properties": {
-                        "projectName": {"type": "string"},
-                        "projectDescription": {"type": "string"},
-                        "projectSkills": {"type": "array", "items": {"type": "string"}},
+        try:
+            response = await MODEL.generate_content_async(
+                contents=[text_part["text"], file_part],
+                generation_config=GenerationConfig(
+                    response_mime_type="application/json",
+                    response_schema={
+                        "type": "object",
+                        "properties": {
+                            "projectName": {"type": "string"},
+                            "projectDescription": {"type": "string"},
+                            "projectSkills": {"type": "array", "items": {"type": "string"}},
+                        }
                     }
-                }
+                )
             )
-        )
+        finally:
+            # Don't leave large uploads in the File API quota
+            if uploaded is not None:
+                await asyncio.to_thread(uploaded.delete)
         return JSONResponse(content=json.loads(response.text))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Document analysis failed")
@@ -66,20 +75,42 @@ async def analyze_document(file: UploadFile = File(...)):
 async def analyze_team(request_data: dict):
     """Get team recommendations from Google GenAI"""
     try:
-        ai = GoogleGenAI(api_key=os.getenv("GEMINI_API_KEY"))
-        response = await ai.models.generate_content(
-            model="gemini-2.5-flash",
+        response = await MODEL.generate_content_async(
             contents=request_data["prompt"],
-            config={
-                "responseMimeType": "application/json",
-                "responseSchema": {
-                    "type": Type.OBJECT,
+            generation_config=GenerationConfig(
+                response_mime_type="application/json",
+                response_schema={
+                    "type": "object",
                     "properties": {
-                        "bestMatches": {"type": Type.ARRAY},
-                        "trainingRecommendations": {"type": Type.ARRAY}
-                    }
+                        "bestMatches": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "userId": {"type": "string"},
+                                    "matchPercentage": {"type": "number"},
+                                    "justification": {"type": "string"},
+                                    "missingSkills": {"type": "array", "items": {"type": "string"}},
+                                },
+                                "required": ["userId", "matchPercentage", "justification", "missingSkills"],
+                            }
+                        },
+                        "trainingRecommendations": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "userId": {"type": "string"},
+                                    "missingSkills": {"type": "array", "items": {"type": "string"}},
+                                    "reason": {"type": "string"},
+                                },
+                                "required": ["userId", "missingSkills", "reason"],
+                            }
+                        }
+                    },
+                    "required": ["bestMatches", "trainingRecommendations"],
                 }
-            }
+            )
         )
         return JSONResponse(content=json.loads(response.text))
     except Exception as e: